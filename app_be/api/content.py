@@ -5,6 +5,7 @@ from typing import Optional, Union
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app_be.database import cache
 from app_be.database.db import get_db
 from app_be.models.schemas import (
     ChapterOut,
@@ -15,37 +16,53 @@ from app_be.services import content_service
 
 router = APIRouter()
 
+# Handlers return ready-made response schemas (or their cached JSON), so the
+# routes use response_model=None to skip FastAPI validating them a second time
 
-@router.get("/chapters", response_model=list[ChapterOut])
-def list_chapters(db: Session = Depends(get_db)):
-    return content_service.get_all_chapters(db)
+# Textbook data only changes when the database is re-seeded
+CONTENT_CACHE_TTL = 600  # in seconds
 
 
-@router.get("/chapters/{chapter_id}", response_model=Optional[ChapterOut])
-def get_chapter(chapter_id: int, db: Session = Depends(get_db)):
-    chapter = content_service.get_chapter_by_id(db, chapter_id, with_topics=True)
-    return chapter
+@router.get("/chapters", response_model=None)
+def list_chapters(db: Session = Depends(get_db)) -> list[ChapterOut]:
+    return cache.get_or_set(
+        f"{cache.CONTENT_KEY_PREFIX}chapters",
+        CONTENT_CACHE_TTL,
+        lambda: content_service.get_all_chapters_out(db),
+    )
 
 
-@router.get("/topics", response_model=list[TopicOut])
-def list_topics(db: Session = Depends(get_db)):
-    return content_service.get_all_topics(db, with_content=False)
+@router.get("/chapters/{chapter_id}", response_model=None)
+def get_chapter(chapter_id: int) -> Optional[ChapterOut]:
+    return content_service.get_chapter_out(chapter_id)
 
 
-@router.get("/topics/{topic_id}", response_model=Optional[TopicOut])
-def get_topic(topic_id: int, db: Session = Depends(get_db)):
-    topic = content_service.get_topic_by_id(db, topic_id, with_content=False)
-    return topic
+@router.get("/topics", response_model=None)
+def list_topics(db: Session = Depends(get_db)) -> list[TopicOut]:
+    return cache.get_or_set(
+        f"{cache.CONTENT_KEY_PREFIX}topics",
+        CONTENT_CACHE_TTL,
+        lambda: content_service.get_all_topics_out(db),
+    )
 
 
-@router.get("/topics/{topic_id}/contents", response_model=list[ContentOut])
-def get_contents_for_topic(topic_id: int, db: Session = Depends(get_db)):
-    return content_service.get_content_for_topic(db, topic_id)
+@router.get("/topics/{topic_id}", response_model=None)
+def get_topic(topic_id: int) -> Optional[TopicOut]:
+    return content_service.get_topic_out(topic_id)
 
 
-@router.get("/search", response_model=dict[str, list[Union[TopicOut, ContentOut]]])
+@router.get("/topics/{topic_id}/contents", response_model=None)
+def get_contents_for_topic(
+    topic_id: int, db: Session = Depends(get_db)
+) -> list[ContentOut]:
+    return content_service.get_content_for_topic_out(db, topic_id)
+
+
+@router.get("/search", response_model=None)
 def search(
     query: str = Query(..., min_length=1),
     db: Session = Depends(get_db),
-):
-    return content_service.search_topics_and_content(db, query)
+) -> dict[str, list[Union[TopicOut, ContentOut]]]:
+    if len(query) <= content_service.SEARCH_CACHE_MAX_QUERY_LENGTH:
+        return content_service.search_topics_and_content_cached(query)
+    return content_service.search_topics_and_content_out(db, query)
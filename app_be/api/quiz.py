@@ -4,21 +4,30 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app_be.database.db import get_db
-from app_be.models.schemas import (
-    Question,
-    QuizRequest,
-)
+from app_be.models.schemas import Question, QuizRequest, thin
 from app_be.services import content_service, llm_service
 
 router = APIRouter()
 
 
-@router.post("/quizzes/generate", response_model=list[Question])
+# Questions are returned without their topic, which the client already has
+QuizQuestion = thin(
+    Question,
+    "id",
+    "text",
+    "latex_content",
+    "question_type",
+    "difficulty",
+    "topic_id",
+    "answers",
+)
+
+
+@router.post("/quizzes/generate", response_model=list[QuizQuestion])
 def generate_quiz(quiz_req: QuizRequest, db: Session = Depends(get_db)):
     """Generate a quiz for a specific topic with optional difficulty level"""
     # Verify that the topic exists
-    topic = content_service.get_topic_by_id(db, quiz_req.topic_id)
-    if topic is None:
+    if content_service.get_topic_out(quiz_req.topic_id) is None:
         raise HTTPException(status_code=404, detail="Topic not found")
 
     # Get questions for the topic with optional difficulty filter
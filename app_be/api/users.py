@@ -11,11 +11,13 @@ from app_be.models.schemas import (
 )
 from app_be.models.schemas import UserOut as UserSchema
 from app_be.models.schemas import (
+    UserPage,
     UserProgress,
     UserProgressCreate,
+    UserProgressInDB,
     UserUpdate,
 )
-from app_be.services import progress_service, user_service
+from app_be.services import progress_service, security, user_service
 
 router = APIRouter()
 
@@ -23,18 +25,28 @@ router = APIRouter()
 # User management endpoints
 @router.post("/users/", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    # Hash before the first query so the slow KDF never runs inside a transaction
+    hashed_password = security.get_password_hash(user.password)
     db_user = user_service.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
-    return user_service.create_user(db=db, user=user)
+    return user_service.create_user(db=db, user=user, hashed_password=hashed_password)
 
 
-@router.get("/users/", response_model=list[UserSchema])
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = user_service.get_users(db, skip=skip, limit=limit)
-    return users
+# Returns validated schemas itself, so FastAPI needn't validate them again
+@router.get("/users/", response_model=None)
+def list_users(
+    after_id: int = 0, limit: int = 100, db: Session = Depends(get_db)
+) -> UserPage:
+    users = user_service.get_users(db, after_id=after_id, limit=limit)
+    # A short page is the last one
+    next_after = users[-1].id if users and len(users) == limit else None
+    return UserPage(
+        items=[UserSchema.model_validate(user) for user in users],
+        next_after=next_after,
+    )
 
 
 @router.get("/users/{user_id}", response_model=UserSchema)
@@ -47,10 +59,15 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 @router.put("/users/{user_id}", response_model=UserSchema)
 def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
-    db_user = user_service.get_user(db, user_id=user_id)
+    hashed_password = (
+        security.get_password_hash(user.password) if user.password else None
+    )
+    db_user = user_service.update_user(
+        db=db, user_id=user_id, user=user, hashed_password=hashed_password
+    )
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user_service.update_user(db=db, user_id=user_id, user=user)
+    return db_user
 
 
 @router.get("/users/{user_id}/progress", response_model=list[UserProgress])
@@ -58,8 +75,7 @@ def get_user_progress(
     user_id: int, topic_id: Optional[int] = None, db: Session = Depends(get_db)
 ):
     """Get all progress records for a user, optionally filtered by topic"""
-    user = user_service.get_user(db, user_id=user_id)
-    if user is None:
+    if not user_service.user_exists(db, user_id=user_id):
         raise HTTPException(status_code=404, detail="User not found")
 
     return progress_service.get_user_progress(db=db, user_id=user_id, topic_id=topic_id)
@@ -68,15 +84,16 @@ def get_user_progress(
 # User progress endpoints
 @router.post(
     "/users/{user_id}/progress",
-    response_model=UserProgress,
+    # The new record's user and topic are never needed by the caller, so skip
+    # lazy-loading both just to serialize them
+    response_model=UserProgressInDB,
     status_code=status.HTTP_201_CREATED,
 )
 def record_user_progress(
     user_id: int, progress: UserProgressCreate, db: Session = Depends(get_db)
 ):
     """Record a new progress entry for a user"""
-    user = user_service.get_user(db, user_id=user_id)
-    if user is None:
+    if not user_service.user_exists(db, user_id=user_id):
         raise HTTPException(status_code=404, detail="User not found")
 
     # Ensure the user_id in the path matches the one in the request body
@@ -92,8 +109,7 @@ def record_user_progress(
 @router.get("/users/{user_id}/curriculum-progress", response_model=dict)
 def get_curriculum_progress(user_id: int, db: Session = Depends(get_db)):
     """Get overall curriculum progress statistics for a user"""
-    user = user_service.get_user(db, user_id=user_id)
-    if user is None:
+    if not user_service.user_exists(db, user_id=user_id):
         raise HTTPException(status_code=404, detail="User not found")
 
     return progress_service.get_curriculum_summary(db=db, user_id=user_id)
@@ -0,0 +1,20 @@
+# type: ignore
+
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class LLMSettings(BaseSettings):
+    """Anthropic credentials, read from the environment or .env"""
+
+    anthropic_api_key: str
+    anthropic_model_test: str
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+
+@lru_cache(maxsize=1)
+def get_llm_settings() -> LLMSettings:
+    """Load the LLM settings once per process"""
+    return LLMSettings()
@@ -0,0 +1,106 @@
+# type: ignore
+
+import json
+import os
+from typing import Any, Callable, Optional
+
+import redis
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+
+load_dotenv()
+
+# Caching is disabled when no Redis server is configured (e.g. local development)
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Prefix shared by all cached textbook reads (chapters, topics, ...)
+CONTENT_KEY_PREFIX = "content:"
+
+redis_client: Optional[redis.Redis] = (
+    redis.Redis.from_url(REDIS_URL, decode_responses=True) if REDIS_URL else None
+)
+
+
+def get_json(key: str) -> Optional[Any]:
+    """Return the cached value for a key, or None on a miss"""
+    if redis_client is None:
+        return None
+    try:
+        raw = redis_client.get(key)
+    except redis.RedisError as e:
+        print(f"Cache read failed for '{key}': {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def set_json(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-serializable value under a key for ttl seconds"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.setex(key, ttl, json.dumps(value))
+    except redis.RedisError as e:
+        print(f"Cache write failed for '{key}': {e}")
+
+
+def get_many_json(keys: list[str]) -> list[Optional[Any]]:
+    """Return the cached values for keys in one round trip, None for misses"""
+    if redis_client is None or not keys:
+        return [None] * len(keys)
+    try:
+        raws = redis_client.mget(keys)
+    except redis.RedisError as e:
+        print(f"Cache read failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+    return [json.loads(raw) if raw is not None else None for raw in raws]
+
+
+def set_many_json(values: dict[str, Any], ttl: int) -> None:
+    """Store several JSON-serializable values for ttl seconds in one round trip"""
+    if redis_client is None or not values:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, ttl, json.dumps(value))
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Cache write failed for {len(values)} keys: {e}")
+
+
+def delete(*keys: str) -> None:
+    """Remove keys from the cache"""
+    if redis_client is None or not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        print(f"Cache delete failed for {keys}: {e}")
+
+
+def delete_prefix(prefix: str) -> None:
+    """Remove every key starting with prefix from the cache"""
+    if redis_client is None:
+        return
+    try:
+        keys = list(redis_client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            redis_client.delete(*keys)
+    except redis.RedisError as e:
+        print(f"Cache delete failed for prefix '{prefix}': {e}")
+
+
+def get_or_set(key: str, ttl: int, loader: Callable[[], Any]) -> Any:
+    """
+    Read-through cache: return the cached value for key, otherwise call loader,
+    cache its JSON-encoded result for ttl seconds and return it.
+    None results are not cached.
+    """
+    cached = get_json(key)
+    if cached is not None:
+        return cached
+
+    value = jsonable_encoder(loader())
+    if value is not None:
+        set_json(key, value, ttl)
+    return value
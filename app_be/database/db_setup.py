@@ -1,17 +1,33 @@
+import argparse
 import csv
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional
 
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 
+from app_be.database import cache
 from app_be.database.db import Base, SessionLocal, engine
+from app_be.database.db import init_db as init_schema
 from app_be.models.db_models import Chapter, Content, Topic  # type: ignore
+from app_be.services import content_service
 
+TEXTBOOKS_DIR = Path(__file__).resolve().parent.parent / "textbooks"
 
-def init_sample_topics(db: Session) -> dict[int, Topic]:
+# Number of content.csv rows read and inserted per batch
+CONTENT_BATCH_SIZE = 1000
+
+
+def init_sample_topics(db: Session) -> dict[int, dict[str, Any]]:
     """Load chapters and topics from topics.csv into the database"""
-    chapters_by_name: dict[str, Chapter] = {}
+    chapter_rows: dict[str, dict[str, Any]] = {}
+    topic_rows: list[dict[str, Any]] = []
+    # Map of topic_id to topic row, used when creating Content
+    topic_dict: dict[int, dict[str, Any]] = {}
 
     with open(
-        "app_be/textbooks/linear_algebra_topics.csv",
+        TEXTBOOKS_DIR / "linear_algebra_topics.csv",
         mode="r",
         newline="",
         encoding="utf-8",
@@ -20,69 +36,79 @@ def init_sample_topics(db: Session) -> dict[int, Topic]:
 
         for row in reader:
             chapter_title = row["chapter"]
-            topic_name = row["name"]
             chapter_order = int(row["chapter_order"]) if row["chapter_order"] else 0
             chapter_id = int(row["chapter_id"]) if row["chapter_id"] else None
             topic_id = int(row["topic_id"]) if row["topic_id"] else None
 
-            # Check if Chapter already created (locally)
-            chapter = chapters_by_name.get(chapter_title)
-            if not chapter:
-                chapter = Chapter(id=chapter_id, title=chapter_title)
-                db.add(chapter)
-                chapters_by_name[chapter_title] = chapter
-
-            # Create Topic
-            topic = Topic(
-                id=topic_id,
-                name=topic_name,
-                chapter=chapter,
-                chapter_order=chapter_order,
-            )
-            db.add(topic)
-
+            # The first row seen for a chapter defines it
+            if chapter_title not in chapter_rows:
+                chapter_rows[chapter_title] = {"id": chapter_id, "title": chapter_title}
+
+            topic = {
+                "id": topic_id,
+                "name": row["name"],
+                "chapter_id": chapter_rows[chapter_title]["id"],
+                "chapter_order": chapter_order,
+            }
+            topic_rows.append(topic)
+            if topic_id is not None:
+                topic_dict[topic_id] = topic
+
+    # Chapters first so the topics' chapter_id references already exist
+    db.bulk_insert_mappings(Chapter, list(chapter_rows.values()))
+    db.bulk_insert_mappings(Topic, topic_rows)
     db.commit()
 
-    # Return a map of topic_id to Topic object for use when creating Content
-    topics = db.query(Topic).all()
-    topic_dict = {topic.id: topic for topic in topics}
     return topic_dict
 
 
-def init_sample_content(db: Session, topic_dict: dict[int, Topic]) -> None:
-    """Load content from content.csv into the database"""
+def _content_mapping(
+    row: dict[str, str], topic_dict: dict[int, dict[str, Any]]
+) -> Optional[dict[str, Any]]:
+    """Convert a content.csv row into an insert mapping, or None to skip it"""
+    topic_id = int(row["topic_id"]) if row["topic_id"] else None
+    if topic_id not in topic_dict:
+        print(
+            f"""Warning: topic_id {topic_id} not found in topics.
+            Skipping content '{row['title']}'."""
+        )
+        return None
+
+    return {
+        "title": row["title"],
+        "latex_content": row.get("latex_content"),
+        "text_content": row["text_content"],
+        "content_type": row["content_type"],
+        "topic_id": topic_id,
+    }
+
+
+def init_sample_content(db: Session, topic_dict: dict[int, dict[str, Any]]) -> None:
+    """Load content from content.csv into the database in fixed-size batches"""
     with open(
-        "app_be/textbooks/linear_algebra_content.csv",
+        TEXTBOOKS_DIR / "linear_algebra_content.csv",
         mode="r",
         newline="",
         encoding="utf-8",
     ) as file:
         reader = csv.DictReader(file)
 
-        for row in reader:
-            topic_id = int(row["topic_id"]) if row["topic_id"] else None
-            if topic_id not in topic_dict:
-                print(
-                    f"""Warning: topic_id {topic_id} not found in topics.
-                    Skipping content '{row['title']}'."""
-                )
-                continue
-
-            content = Content(
-                title=row["title"],
-                latex_content=row.get("latex_content"),
-                text_content=row["text_content"],
-                content_type=row["content_type"],
-                topic_id=topic_id,
-            )
-            db.add(content)
+        # Only one batch of rows is held in memory at a time; every batch is
+        # written in the same transaction and committed once at the end
+        while batch := list(islice(reader, CONTENT_BATCH_SIZE)):
+            content_rows = [
+                mapping
+                for mapping in (_content_mapping(row, topic_dict) for row in batch)
+                if mapping is not None
+            ]
+            db.bulk_insert_mappings(Content, content_rows)
 
     db.commit()
 
 
 def create_tables() -> None:
-    """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create missing database tables and indexes, keeping existing data"""
+    init_schema()
 
 
 def drop_tables() -> None:
@@ -90,8 +116,20 @@ def drop_tables() -> None:
     Base.metadata.drop_all(bind=engine)
 
 
+def has_textbook_data(db: Session) -> bool:
+    """Whether any chapters, topics or content have been loaded already"""
+    return any(
+        db.scalar(select(exists().select_from(model)))
+        for model in (Chapter, Topic, Content)
+    )
+
+
 def init_db(should_drop: bool = False) -> None:
-    """Initialize the database with tables and optional sample data"""
+    """
+    Initialize the database with tables and sample data. Existing tables are
+    kept, and the textbook is only seeded into empty textbook tables, unless
+    should_drop is set, which drops everything (including users) first.
+    """
     if should_drop:
         print("Dropping existing tables...")
         drop_tables()
@@ -101,12 +139,20 @@ def init_db(should_drop: bool = False) -> None:
 
     db = SessionLocal()
     try:
+        if has_textbook_data(db):
+            print("Textbook data already present, skipping sample data.")
+            return
+
         print("Adding sample topics and chapters...")
         topic_dict = init_sample_topics(db)
 
         print("Adding sample content...")
         init_sample_content(db, topic_dict)
 
+        # Drop cached textbook reads so the API serves the freshly seeded data
+        cache.delete_prefix(cache.CONTENT_KEY_PREFIX)
+        content_service.bump_content_version()
+
         print("Database initialization complete!")
     except Exception as e:
         print(f"Error during database initialization: {e}")
@@ -116,5 +162,19 @@ def init_db(should_drop: bool = False) -> None:
         db.close()
 
 
+def main() -> None:
+    """Entry point for the `init-db` script: create the schema and seed it"""
+    parser = argparse.ArgumentParser(
+        description="Create missing tables and load the sample textbook"
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="drop every table, including user data, before recreating them",
+    )
+    args = parser.parse_args()
+    init_db(should_drop=args.drop)
+
+
 if __name__ == "__main__":
-    init_db(should_drop=True)
+    main()
@@ -1,14 +1,28 @@
 # type: ignore
 
+import itertools
+import os
+
+import anyio
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app_be.api import content, quiz, users
-from app_be.database.db import init_db
+from app_be.database.db import MAX_OVERFLOW, POOL_SIZE, init_db, request_scope
 
 app = FastAPI(title="Linear Algebra Learning Platform API")
 
+# Sync route handlers share AnyIO's worker threads, 40 by default. Never fewer
+# than that, since cache-served routes need no connection, and at least as many
+# as the pool holds; the default pool (20 + 20 overflow) matches the 40 threads
+ANYIO_DEFAULT_THREADS = 40
+THREADPOOL_SIZE = int(
+    os.getenv(
+        "THREADPOOL_SIZE", str(max(ANYIO_DEFAULT_THREADS, POOL_SIZE + MAX_OVERFLOW))
+    )
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +32,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_request_ids = itertools.count()
+
+
+@app.middleware("http")
+async def scope_db_session(request: Request, call_next):
+    """Key the scoped database session to the request being served"""
+    token = request_scope.set(next(_request_ids))
+    try:
+        return await call_next(request)
+    finally:
+        request_scope.reset(token)
+
+
 # Include routers
 app.include_router(content.router, prefix="/api/content", tags=["content"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -26,7 +53,12 @@ app.include_router(quiz.router, prefix="/api/quiz", tags=["quiz"])
 
 @app.on_event("startup")
 def startup() -> None:
-    init_db()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # Schema setup is a deploy step (`init-db`); running it in every worker
+    # serializes their boot on DDL, so it is opt-in here for local development
+    if os.getenv("RUN_INIT_DB") == "1":
+        init_db()
 
 
 @app.get("/")
@@ -1,6 +1,9 @@
 # type: ignore
 
+from datetime import timezone
+
 from sqlalchemy import (
+    DDL,
     JSON,
     Boolean,
     Column,
@@ -8,9 +11,14 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    TypeDecorator,
+    desc,
+    event,
+    text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,15 +26,46 @@ from sqlalchemy.sql import func
 from app_be.database.db import Base
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC datetimes on every backend. SQLite drops the offset, so
+    values are stored as UTC and naive values read back are taken to be UTC.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+            if dialect.name == "sqlite":
+                value = value.replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Emails are looked up case-insensitively; older rows kept the case of
+        # the part before the @, so the index is over lower(email)
+        Index("ix_users_email_lower", func.lower(text("email")), unique=True),
+    )
+    # Server-generated columns come back via RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(UTCDateTime, server_default=func.now())
 
 
 class Chapter(Base):
@@ -57,6 +96,10 @@ class Topic(Base):
 
 class Content(Base):
     __tablename__ = "contents"
+    __table_args__ = (
+        # Content for a topic is listed in chapter order
+        Index("ix_content_topic_order", "topic_id", "chapter_order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -74,6 +117,10 @@ class Content(Base):
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Quizzes select questions by topic and, optionally, difficulty
+        Index("ix_question_topic_difficulty", "topic_id", "difficulty"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text)
@@ -84,11 +131,15 @@ class Question(Base):
 
     # Relationships
     topic = relationship("Topic", back_populates="questions")
-    answers = relationship("Answer", back_populates="question")
+    answers = relationship("Answer", back_populates="question", lazy="selectin")
 
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Quiz results look up the correct answer(s) of a set of questions
+        Index("ix_answer_qid_correct", "question_id", "is_correct"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text)
@@ -103,13 +154,22 @@ class Answer(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        # Progress is listed newest first per user, optionally for one topic;
+        # the topic index also serves the latest-progress-per-topic window
+        Index("ix_userprogress_user_completed", "user_id", desc("completed_at")),
+        Index(
+            "ix_userprogress_user_topic", "user_id", "topic_id", desc("completed_at")
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     topic_id = Column(Integer, ForeignKey("topics.id"))
     score = Column(Float)
     time_spent = Column(Integer)  # in seconds
-    completed_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(UTCDateTime, server_default=func.now())
     topic_name = Column(String)  # Denormalized for easier querying
     difficulty = Column(String)
 
@@ -120,11 +180,16 @@ class UserProgress(Base):
 
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        # A user's attempts are listed newest first
+        Index("ix_quizattempt_user_started", "user_id", desc("started_at")),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
-    completed_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(UTCDateTime, server_default=func.now())
+    completed_at = Column(UTCDateTime, nullable=True)
     score = Column(Float, nullable=True)
 
     # Relationships
@@ -134,6 +199,10 @@ class QuizAttempt(Base):
 
 class UserAnswer(Base):
     __tablename__ = "user_answers"
+    __table_args__ = (
+        # Attempts are matched to the questions (and topics) they answered
+        Index("ix_useranswer_attempt_question", "quiz_attempt_id", "question_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quiz_attempt_id = Column(Integer, ForeignKey("quiz_attempts.id"))
@@ -150,14 +219,78 @@ class UserAnswer(Base):
 
 class KnowledgeGap(Base):
     __tablename__ = "knowledge_gaps"
+    __table_args__ = (
+        # A user's gaps are listed lowest confidence first
+        Index("ix_knowledgegap_user_conf", "user_id", "confidence_level"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     topic_id = Column(Integer, ForeignKey("topics.id"))
-    identified_at = Column(DateTime(timezone=True), server_default=func.now())
+    identified_at = Column(UTCDateTime, server_default=func.now())
     confidence_level = Column(Float)  # 0-1 scale
     meta_data = Column(JSON, nullable=True)  # Additional gap details
 
     # Relationships
     user = relationship("User")
     topic = relationship("Topic")
+
+
+# -------- FULL-TEXT SEARCH (SQLite) --------
+# FTS5 index over contents.title/text_content, kept in sync by triggers.
+# Created alongside the tables and rebuilt so existing rows are indexed.
+CONTENT_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+        title, text_content, content='contents', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_insert AFTER INSERT ON contents
+    BEGIN
+        INSERT INTO content_fts(rowid, title, text_content)
+        VALUES (new.id, new.title, new.text_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_delete AFTER DELETE ON contents
+    BEGIN
+        INSERT INTO content_fts(content_fts, rowid, title, text_content)
+        VALUES ('delete', old.id, old.title, old.text_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_update AFTER UPDATE ON contents
+    BEGIN
+        INSERT INTO content_fts(content_fts, rowid, title, text_content)
+        VALUES ('delete', old.id, old.title, old.text_content);
+        INSERT INTO content_fts(rowid, title, text_content)
+        VALUES (new.id, new.title, new.text_content);
+    END""",
+    "INSERT INTO content_fts(content_fts) VALUES ('rebuild')",
+]
+
+for statement in CONTENT_FTS_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS content_fts").execute_if(dialect="sqlite"),
+)
+
+# PostgreSQL full-text search: GIN indexes over the same tsvector expressions
+# that content_service searches with, so the planner can use them
+TOPIC_TSVECTOR_SQL = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+)
+CONTENT_TSVECTOR_SQL = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(text_content, ''))"
+)
+
+TSVECTOR_INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_topics_tsv ON topics "
+    f"USING GIN ({TOPIC_TSVECTOR_SQL})",
+    f"CREATE INDEX IF NOT EXISTS ix_contents_tsv ON contents "
+    f"USING GIN ({CONTENT_TSVECTOR_SQL})",
+]
+
+for statement in TSVECTOR_INDEX_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
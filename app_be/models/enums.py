@@ -0,0 +1,22 @@
+# type: ignore
+
+from enum import Enum
+
+
+class ContentType(str, Enum):
+    lesson = "lesson"
+    example = "example"
+    theorem = "theorem"
+    definition = "definition"
+    proof = "proof"
+
+
+class DifficultyLevel(str, Enum):
+    easy = "easy"
+    medium = "medium"
+    hard = "hard"
+
+
+class QuestionType(str, Enum):
+    multiple_choice = "multiple_choice"
+    open_ended = "open_ended"
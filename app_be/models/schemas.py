@@ -3,35 +3,53 @@
 from __future__ import annotations
 
 from datetime import datetime
-from enum import Enum
-from typing import Any, Optional
-
-from pydantic import BaseModel, EmailStr
-
-
-# -------- ENUMS --------
-class ContentType(str, Enum):
-    lesson = "lesson"
-    example = "example"
-    theorem = "theorem"
-    definition = "definition"
-    proof = "proof"
-
-
-class DifficultyLevel(str, Enum):
-    easy = "easy"
-    medium = "medium"
-    hard = "hard"
-
-
-class QuestionType(str, Enum):
-    multiple_choice = "multiple_choice"
-    open_ended = "open_ended"
+from functools import lru_cache
+from typing import Annotated, Any, Optional
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    StringConstraints,
+    create_model,
+    model_validator,
+)
+
+from app_be.models.enums import ContentType, DifficultyLevel, QuestionType
+
+
+class _Base(BaseModel):
+    # Core schemas are built on first use rather than at import time
+    model_config = ConfigDict(defer_build=True, from_attributes=True)
+
+
+@lru_cache(maxsize=None)
+def thin(model: type[BaseModel], *include: str) -> type[BaseModel]:
+    """
+    A copy of model with only the included fields, for responses that never
+    populate the rest (e.g. optional relationships). Built once per field set.
+    """
+    fields = {
+        name: (field.annotation, field)
+        for name, field in model.model_fields.items()
+        if name in include
+    }
+    name = f"{model.__name__}_{'_'.join(sorted(fields))}"
+    return create_model(name, __base__=_Base, **fields)
+
+
+# A plain pattern check, run by pydantic-core, in place of email-validator.
+# Emails are stored trimmed and lowercased so lookups hit the unique index.
+Email = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True, to_lower=True, pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+    ),
+]
 
 
 # -------- USER SCHEMAS --------
-class UserBase(BaseModel):
-    email: EmailStr
+class UserBase(_Base):
+    email: Email
     username: str
 
 
@@ -39,8 +57,8 @@ class UserCreate(UserBase):
     password: str
 
 
-class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
+class UserUpdate(_Base):
+    email: Optional[Email] = None
     username: Optional[str] = None
     password: Optional[str] = None
 
@@ -50,12 +68,14 @@ class UserOut(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+
+class UserPage(_Base):
+    items: list[UserOut]
+    next_after: Optional[int] = None  # Pass as after_id to fetch the next page
 
 
 # -------- CHAPTER SCHEMAS --------
-class ChapterBase(BaseModel):
+class ChapterBase(_Base):
     title: str
     description: Optional[str] = None
 
@@ -64,7 +84,7 @@ class ChapterCreate(ChapterBase):
     pass
 
 
-class ChapterUpdate(BaseModel):
+class ChapterUpdate(_Base):
     title: Optional[str] = None
     description: Optional[str] = None
 
@@ -72,12 +92,9 @@ class ChapterUpdate(BaseModel):
 class ChapterOut(ChapterBase):
     id: int
 
-    class Config:
-        from_attributes = True
-
 
 # -------- TOPIC SCHEMAS --------
-class TopicBase(BaseModel):
+class TopicBase(_Base):
     name: str
     description: Optional[str] = ""
     chapter_order: Optional[int] = 0
@@ -88,7 +105,7 @@ class TopicCreate(TopicBase):
     pass
 
 
-class TopicUpdate(BaseModel):
+class TopicUpdate(_Base):
     name: Optional[str] = None
     description: Optional[str] = None
     chapter_order: Optional[int] = None
@@ -98,12 +115,9 @@ class TopicUpdate(BaseModel):
 class TopicOut(TopicBase):
     id: int
 
-    class Config:
-        from_attributes = True
-
 
 # -------- CONTENT SCHEMAS --------
-class ContentBase(BaseModel):
+class ContentBase(_Base):
     title: str
     content_type: ContentType
     text_content: str
@@ -116,7 +130,7 @@ class ContentCreate(ContentBase):
     pass
 
 
-class ContentUpdate(BaseModel):
+class ContentUpdate(_Base):
     title: Optional[str] = None
     content_type: Optional[ContentType] = None
     text_content: Optional[str] = None
@@ -128,12 +142,9 @@ class ContentUpdate(BaseModel):
 class ContentOut(ContentBase):
     id: int
 
-    class Config:
-        from_attributes = True
-
 
 # -------- ANSWER SCHEMAS --------
-class AnswerBase(BaseModel):
+class AnswerBase(_Base):
     text: str
     latex_content: Optional[str] = None
     is_correct: bool = False
@@ -144,7 +155,7 @@ class AnswerCreate(AnswerBase):
     pass
 
 
-class AnswerUpdate(BaseModel):
+class AnswerUpdate(_Base):
     text: Optional[str] = None
     latex_content: Optional[str] = None
     is_correct: Optional[bool] = None
@@ -155,16 +166,13 @@ class AnswerInDB(AnswerBase):
     id: int
     question_id: int
 
-    class Config:
-        from_attributes = True
-
 
 class Answer(AnswerInDB):
     pass
 
 
 # -------- QUESTION SCHEMAS --------
-class QuestionBase(BaseModel):
+class QuestionBase(_Base):
     text: str
     latex_content: Optional[str] = None
     question_type: QuestionType
@@ -176,7 +184,7 @@ class QuestionCreate(QuestionBase):
     answers: list[AnswerCreate]
 
 
-class QuestionUpdate(BaseModel):
+class QuestionUpdate(_Base):
     text: Optional[str] = None
     latex_content: Optional[str] = None
     question_type: Optional[QuestionType] = None
@@ -187,15 +195,32 @@ class QuestionUpdate(BaseModel):
 class QuestionInDB(QuestionBase):
     id: int
 
-    class Config:
-        from_attributes = True
-
 
 class Question(QuestionInDB):
     answers: list[Answer] = []
     topic: Optional[TopicOut] = None
 
 
+class GeneratedQuestion(_Base):
+    """A question as returned by the LLM, before it is tied to a topic"""
+
+    text: str
+    latex_content: Optional[str] = None
+    question_type: QuestionType
+    difficulty: DifficultyLevel
+    answers: list[AnswerCreate]
+
+    @model_validator(mode="after")
+    def check_multiple_choice_answers(self) -> GeneratedQuestion:
+        """Multiple choice needs at least 4 options with exactly one correct"""
+        if self.question_type == QuestionType.multiple_choice:
+            if len(self.answers) < 4:
+                raise ValueError("multiple choice questions need at least 4 answers")
+            if sum(answer.is_correct for answer in self.answers) != 1:
+                raise ValueError("multiple choice questions need one correct answer")
+        return self
+
+
 # -------- TOPIC FULL VIEW --------
 class Topic(TopicOut):
     contents: list[ContentOut] = []
@@ -209,7 +234,7 @@ class Chapter(ChapterOut):
 
 
 # -------- USER PROGRESS SCHEMAS --------
-class UserProgressBase(BaseModel):
+class UserProgressBase(_Base):
     user_id: int
     topic_id: int
     score: float
@@ -226,9 +251,6 @@ class UserProgressInDB(UserProgressBase):
     id: int
     completed_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class UserProgress(UserProgressInDB):
     user: Optional[UserOut] = None
@@ -236,7 +258,7 @@ class UserProgress(UserProgressInDB):
 
 
 # -------- QUIZ SCHEMAS --------
-class UserAnswerRequest(BaseModel):
+class UserAnswerRequest(_Base):
     question_id: int
     selected_answer_id: int
     time_taken: Optional[int] = None
@@ -247,41 +269,38 @@ class UserAnswerResponse(UserAnswerRequest):
     explanation: Optional[str] = None
 
 
-class QuizRequest(BaseModel):
+class QuizRequest(_Base):
     topic_id: int
     difficulty: Optional[DifficultyLevel] = None
     question_count: Optional[int] = 5
 
 
-class QuizAttemptCreate(BaseModel):
+class QuizAttemptCreate(_Base):
     user_id: int
     answers: list[UserAnswerRequest]
 
 
-class QuizAttemptInDB(BaseModel):
+class QuizAttemptInDB(_Base):
     id: int
     user_id: int
     started_at: datetime
     completed_at: Optional[datetime] = None
     score: Optional[float] = None
 
-    class Config:
-        from_attributes = True
-
 
 class QuizAttempt(QuizAttemptInDB):
     answers: list[UserAnswerResponse] = []
     user: Optional[UserOut] = None
 
 
-class QuizResult(BaseModel):
+class QuizResult(_Base):
     quiz_attempt: QuizAttempt
     knowledge_gaps: list[dict[str, Any]] = []
     recommendations: list[dict[str, Any]] = []
 
 
 # -------- KNOWLEDGE GAP SCHEMAS --------
-class KnowledgeGapBase(BaseModel):
+class KnowledgeGapBase(_Base):
     user_id: int
     topic_id: int
     confidence_level: float
@@ -296,17 +315,7 @@ class KnowledgeGapInDB(KnowledgeGapBase):
     id: int
     identified_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class KnowledgeGap(KnowledgeGapInDB):
     user: Optional[UserOut] = None
     topic: Optional[TopicOut] = None
-
-
-# -------- FINAL: RESOLVE FORWARD REFS --------
-Chapter.model_rebuild()
-Topic.model_rebuild()
-ContentOut.model_rebuild()
-Question.model_rebuild()
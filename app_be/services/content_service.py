@@ -1,76 +1,273 @@
 # type: ignore
 
-from typing import Optional, Union
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
 
-from sqlalchemy.orm import Session, joinedload
+from cachetools import TTLCache
+from sqlalchemy import (
+    Integer,
+    Row,
+    bindparam,
+    inspect,
+    literal_column,
+    null,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, raiseload, selectinload
 
-from app_be.models.db_models import Chapter, Content, Topic
+from app_be.database import cache
+from app_be.database.db import SessionLocal
+from app_be.models.db_models import (
+    CONTENT_TSVECTOR_SQL,
+    TOPIC_TSVECTOR_SQL,
+    Chapter,
+    Content,
+    Topic,
+)
+from app_be.models.enums import ContentType
+from app_be.models.schemas import ChapterOut, ContentOut, TopicOut
 
+# Bumped whenever textbook data is re-seeded in this process; part of every
+# by-id cache key so a lookup that raced the change can't be served under the
+# new version. Other processes only see a re-seed once their entries expire.
+_content_version = 0
 
-def get_all_chapters(db: Session, with_topics: bool = True) -> list[Chapter]:
+# In-process chapter/topic lookups by ID; the TTL bounds how long a worker
+# keeps serving data re-seeded by another process (e.g. the init-db script)
+BY_ID_CACHE_SIZE = 1024
+BY_ID_CACHE_TTL = 600  # in seconds
+_chapter_out_cache = TTLCache(maxsize=BY_ID_CACHE_SIZE, ttl=BY_ID_CACHE_TTL)
+_topic_out_cache = TTLCache(maxsize=BY_ID_CACHE_SIZE, ttl=BY_ID_CACHE_TTL)
+_local_cache_lock = threading.Lock()
+
+# Searches up to this length are cached; longer ones are rarely repeated
+SEARCH_CACHE_MAX_QUERY_LENGTH = 64
+SEARCH_CACHE_TTL = 600  # in seconds
+SEARCH_CACHE_SIZE = 512
+_search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+# Statements for the hot read paths are built once so every call reuses the
+# same compiled SQL from the engine's statement cache; ids are bound per call
+_STMT_CHAPTER_ROWS = select(Chapter.id, Chapter.title, Chapter.description)
+_STMT_ALL_CHAPTERS_WITH_TOPICS = select(Chapter).options(
+    selectinload(Chapter.topics), raiseload("*")
+)
+_STMT_TOPIC_ROWS = select(
+    Topic.id, Topic.name, Topic.description, Topic.chapter_order, Topic.chapter_id
+)
+_STMT_CONTENT_ROWS_FOR_TOPIC = (
+    select(
+        Content.id,
+        Content.title,
+        Content.content_type,
+        Content.text_content,
+        Content.latex_content,
+        Content.topic_id,
+        Content.chapter_order,
+    )
+    .where(Content.topic_id == bindparam("tid"))
+    .order_by(Content.chapter_order, Content.id)
+)
+_STMT_CONTENT_FTS_SEARCH = (
+    select(Content)
+    .where(
+        Content.id.in_(
+            text(
+                "SELECT rowid FROM content_fts WHERE content_fts MATCH :match"
+            ).columns(rowid=Integer)
+        )
+    )
+    .order_by(Content.id)
+)
+# PostgreSQL: topics and contents matched against the GIN-indexed tsvector
+# expressions in one UNION ALL round trip; each row carries the columns of
+# both schemas, with the other kind's columns left NULL
+_STMT_TSV_SEARCH = union_all(
+    select(
+        literal_column("'topic'").label("kind"),
+        Topic.id,
+        Topic.name,
+        Topic.description,
+        Topic.chapter_id,
+        null().label("title"),
+        null().label("content_type"),
+        null().label("text_content"),
+        null().label("latex_content"),
+        null().label("topic_id"),
+        Topic.chapter_order,
+    ).where(text(f"{TOPIC_TSVECTOR_SQL} @@ plainto_tsquery('english', :query)")),
+    select(
+        literal_column("'content'"),
+        Content.id,
+        null(),
+        null(),
+        null(),
+        Content.title,
+        Content.content_type,
+        Content.text_content,
+        Content.latex_content,
+        Content.topic_id,
+        Content.chapter_order,
+    ).where(text(f"{CONTENT_TSVECTOR_SQL} @@ plainto_tsquery('english', :query)")),
+).order_by("kind", "id")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def get_all_chapters(db: Session) -> list[Chapter]:
+    """
+    Fetch all chapters with their associated topics.
+    """
+    return db.scalars(_STMT_ALL_CHAPTERS_WITH_TOPICS).all()
+
+
+def get_all_chapters_out(db: Session) -> list[ChapterOut]:
+    """
+    Fetch all chapters as response schemas, built straight from column rows.
+    model_construct skips validation since the values come from typed columns.
+    """
+    return [
+        ChapterOut.model_construct(**row._mapping)
+        for row in db.execute(_STMT_CHAPTER_ROWS)
+    ]
+
+
+def _get_or_load(local_cache: TTLCache, key: Any, load: Callable[[], Any]) -> Any:
+    """Read-through for the in-process caches; None results are not kept"""
+    with _local_cache_lock:
+        value = local_cache.get(key)
+    if value is None:
+        value = load()
+        if value is not None:
+            with _local_cache_lock:
+                local_cache[key] = value
+    return value
+
+
+def _load_chapter_out(chapter_id: int) -> Optional[ChapterOut]:
+    """Chapter schema by ID, read in a session of its own"""
+    with SessionLocal() as db:
+        chapter = db.get(Chapter, chapter_id)
+        return ChapterOut.model_validate(chapter) if chapter else None
+
+
+def get_chapter_out(chapter_id: int) -> Optional[ChapterOut]:
+    """
+    Cached chapter lookup for read paths; opens its own session on a miss.
+    """
+    return _get_or_load(
+        _chapter_out_cache,
+        (chapter_id, _content_version),
+        lambda: _load_chapter_out(chapter_id),
+    )
+
+
+def get_all_topics_out(db: Session) -> list[TopicOut]:
+    """
+    Fetch all topics as response schemas, built straight from column rows.
+    """
+    return [
+        TopicOut.model_construct(**row._mapping) for row in db.execute(_STMT_TOPIC_ROWS)
+    ]
+
+
+def get_topic_by_id(db: Session, topic_id: int) -> Optional[Topic]:
     """
-    Fetch all chapters, optionally with their associated topics.
+    Fetch a single topic by ID.
+    Served from the session's identity map when already loaded.
     """
-    query = db.query(Chapter)
-    if with_topics:
-        query = query.options(joinedload(Chapter.topics))
-    return query.all()
+    return db.get(Topic, topic_id)
+
+
+def _load_topic_out(topic_id: int) -> Optional[TopicOut]:
+    """Topic schema by ID, read in a session of its own"""
+    with SessionLocal() as db:
+        topic = db.get(Topic, topic_id)
+        return TopicOut.model_validate(topic) if topic else None
 
 
-def get_chapter_by_id(
-    db: Session, chapter_id: int, with_topics: bool = False
-) -> Optional[Chapter]:
+def get_topic_out(topic_id: int) -> Optional[TopicOut]:
     """
-    Fetch a single Chapter by ID, optionally with its topics.
+    Cached topic lookup for read paths; opens its own session on a miss.
     """
-    query = db.query(Chapter).filter(Chapter.id == chapter_id)
-    if with_topics:
-        query = query.options(joinedload(Chapter.topics))
-    return query.first()
+    return _get_or_load(
+        _topic_out_cache,
+        (topic_id, _content_version),
+        lambda: _load_topic_out(topic_id),
+    )
 
 
-def get_all_topics(db: Session, with_content: bool = False) -> list[Topic]:
+def get_content_for_topics(db: Session, topic_ids: list[int]) -> dict[int, list[Row]]:
     """
-    Fetch all topics, optionally with their associated content.
+    Fetch the content ids and titles of several topics in one query, grouped by
+    topic and in chapter order.
     """
-    query = db.query(Topic)
-    if with_content:
-        query = query.options(joinedload(Topic.contents))
-    return query.all()
+    contents_by_topic: dict[int, list[Row]] = {}
+    if not topic_ids:
+        return contents_by_topic
+    rows = db.execute(
+        select(Content.id, Content.title, Content.topic_id)
+        .where(Content.topic_id.in_(topic_ids))
+        .order_by(Content.topic_id, Content.chapter_order, Content.id)
+    )
+    for row in rows:
+        contents_by_topic.setdefault(row.topic_id, []).append(row)
+    return contents_by_topic
 
 
-def get_topic_by_id(
-    db: Session, topic_id: int, with_content: bool = False
-) -> Optional[Topic]:
+def get_content_for_topic_out(db: Session, topic_id: int) -> list[ContentOut]:
     """
-    Fetch a single topic by ID, optionally with its content.
+    Fetch a topic's content as response schemas, built straight from column rows.
     """
-    query = db.query(Topic).filter(Topic.id == topic_id)
-    if with_content:
-        query = query.options(joinedload(Topic.contents))
-    return query.first()
+    return [
+        ContentOut.model_construct(
+            **{**row._mapping, "content_type": ContentType(row.content_type)}
+        )
+        for row in db.execute(_STMT_CONTENT_ROWS_FOR_TOPIC, {"tid": topic_id})
+    ]
 
 
-def get_content_for_topic(db: Session, topic_id: int) -> list[Content]:
+def _fts_match_expression(query: str) -> Optional[str]:
     """
-    Fetch all content items for a given topic.
+    Turn free text into an FTS5 MATCH expression that requires every word as a
+    prefix, quoting each word so user input can't inject FTS query syntax.
     """
-    return db.query(Content).filter(Content.topic_id == topic_id).all()
+    words = _WORD_RE.findall(query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
 
 
-def get_content_by_id(db: Session, content_id: int) -> Optional[Content]:
+@lru_cache(maxsize=None)
+def _has_content_fts(bind: Engine) -> bool:
     """
-    Fetch a single content item by its ID.
+    Whether the SQLite content_fts index exists; it is only created by init_db,
+    which workers don't run by default. Checked once per engine.
     """
-    return db.query(Content).filter(Content.id == content_id).first()
+    return inspect(bind).has_table("content_fts")
 
 
 def search_topics_and_content(
     db: Session, query: str
-) -> dict[str, list[Union[Topic, Content]]]:
+) -> dict[str, list[Union[Topic, Content, Row]]]:
     """
     Search for topics and content by a keyword in their name/title/description/text.
+    PostgreSQL uses its tsvector GIN indexes in a single query, returning column
+    rows; SQLite uses the content_fts index when it exists and anything else
+    ILIKE scans.
     """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        results = {"topics": [], "contents": []}
+        for row in db.execute(_STMT_TSV_SEARCH, {"query": query}):
+            results["topics" if row.kind == "topic" else "contents"].append(row)
+        return results
+
     topics = (
         db.query(Topic)
         .filter(
@@ -79,13 +276,68 @@ def search_topics_and_content(
         .all()
     )
 
-    contents = (
-        db.query(Content)
-        .filter(
-            (Content.title.ilike(f"%{query}%"))
-            | (Content.text_content.ilike(f"%{query}%"))
+    match = _fts_match_expression(query)
+    if match is not None and dialect == "sqlite" and _has_content_fts(db.get_bind()):
+        contents = db.scalars(_STMT_CONTENT_FTS_SEARCH, {"match": match}).all()
+    else:
+        contents = (
+            db.query(Content)
+            .filter(
+                (Content.title.ilike(f"%{query}%"))
+                | (Content.text_content.ilike(f"%{query}%"))
+            )
+            .all()
         )
-        .all()
-    )
 
     return {"topics": topics, "contents": contents}
+
+
+def search_topics_and_content_out(
+    db: Session, query: str
+) -> dict[str, list[Union[TopicOut, ContentOut]]]:
+    """
+    Search for topics and content, converting the results to response schemas.
+    """
+    results = search_topics_and_content(db, query)
+    return {
+        "topics": [TopicOut.model_validate(t) for t in results["topics"]],
+        "contents": [ContentOut.model_validate(c) for c in results["contents"]],
+    }
+
+
+def search_topics_and_content_cached(query: str) -> dict[str, list[dict[str, Any]]]:
+    """
+    Cached variant of search_topics_and_content for short, commonly repeated
+    queries. Results are plain dicts, memoized per process and shared between
+    processes through Redis, both for SEARCH_CACHE_TTL. Opens its own session
+    since one from a request must not outlive it inside the cache.
+    """
+
+    def load() -> dict[str, list[Union[TopicOut, ContentOut]]]:
+        with SessionLocal() as db:
+            return search_topics_and_content_out(db, query)
+
+    return _get_or_load(
+        _search_cache,
+        query,
+        lambda: cache.get_or_set(
+            f"{cache.CONTENT_KEY_PREFIX}search:{query}", SEARCH_CACHE_TTL, load
+        ),
+    )
+
+
+def clear_search_cache() -> None:
+    """Forget cached search results after content changes"""
+    with _local_cache_lock:
+        _search_cache.clear()
+    cache.delete_prefix(f"{cache.CONTENT_KEY_PREFIX}search:")
+
+
+def bump_content_version() -> None:
+    """Invalidate every in-process content cache after textbook data changes"""
+    global _content_version
+    _content_version += 1
+    with _local_cache_lock:
+        _chapter_out_cache.clear()
+        _topic_out_cache.clear()
+    clear_search_cache()
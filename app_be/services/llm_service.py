@@ -1,71 +1,191 @@
 # type: ignore
-import json
-import os
+import re
+from functools import lru_cache
+from string import Template
 from typing import Any, Optional
 
-from dotenv import load_dotenv
+import orjson
+from anthropic import APIConnectionError
 from json_repair import repair_json
+from pydantic import TypeAdapter, ValidationError
 from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
 from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.providers.anthropic import AnthropicProvider
-from tenacity import retry, stop_after_attempt, wait_fixed
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, raiseload, selectinload
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
-from app_be.models.schemas import DifficultyLevel, QuestionType
+from app_be.config import get_llm_settings
+from app_be.models.db_models import Question
+from app_be.models.enums import DifficultyLevel, QuestionType
+from app_be.models.schemas import ContentOut, GeneratedQuestion
 
-load_dotenv()
-LLM_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL_TEST")
+# Attempts per LLM call when the API fails transiently
+LLM_MAX_ATTEMPTS = 3
 
+# Built once so the compiled SQL is reused; the difficulty filter gets its own
+# statement rather than being appended per call
+_STMT_QUESTIONS_FOR_TOPIC = (
+    select(Question)
+    .options(selectinload(Question.answers), raiseload("*"))
+    .where(Question.topic_id == bindparam("tid"))
+)
+_STMT_QUESTIONS_FOR_TOPIC_AND_DIFFICULTY = _STMT_QUESTIONS_FOR_TOPIC.where(
+    Question.difficulty == bindparam("difficulty")
+)
 
-def call_llm_api(prompt: str) -> str:
-    """Call the Anthropic LLM using the pydantic_ai agent."""
+
+# Patterns for pulling JSON out of free-form LLM output, compiled once
+_MD_JSON_RE = re.compile(r"```(?:json)?\s*(\[\s*\{.*?\}\s*\])\s*```", re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r"\[\s*\{.*\}\s*\]", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{(?:[^{}]|(?:\{[^{}]*\}))*\}")
+
+# Prefill the expected JSON structure
+_JSON_PREFILL = """[
+  {
+    "text": """
+
+# Only the placeholders are filled in per call; the static text is parsed once
+_QUESTION_PROMPT = Template(
+    """
+You are an expert linear algebra instructor.
+Create $question_count $question_type questions $difficulty_text.
+Topic name: $topic_name
+Here is the content material for this topic:
+$formatted_content
+For each question:
+1. Create a clear, concise question text.
+2. For multiple choice questions, provide exactly 4 answer options
+3. There should be ONE correct answer and THREE plausible distractors.
+4. Include LaTeX where appropriate for mathematical notation.
+5. Explain why the correct answer is correct and why each incorrect answer is wrong.
+6. Assign the appropriate difficulty level (easy, medium, or hard).
+Format your response as a JSON array of question objects.
+Each object MUST have the following structure:
+{
+  "text": "Question text",
+  "latex_content": "LaTeX representation (if needed)",
+  "question_type": "$question_type",
+  "difficulty": "easy|medium|hard",
+  "answers": [
+    {
+      "text": "Answer option text",
+      "latex_content": "LaTeX representation (if needed)",
+      "is_correct": true|false,
+      "explanation": "Explanation why this answer is correct/incorrect"
+    },
+    ...more answers...
+  ]
+}
+
+IMPORTANT: Make sure the JSON is valid and properly formatted.
+Start your response with """
+    + _JSON_PREFILL
+    + "\n"
+)
+
+# Validates a well-formed LLM response straight from its JSON text
+_GENERATED_QUESTIONS = TypeAdapter(list[GeneratedQuestion])
+
+
+def get_questions_for_topic(
+    db: Session,
+    topic_id: int,
+    difficulty: Optional[DifficultyLevel] = None,
+    limit: Optional[int] = None,
+) -> list[Question]:
+    """
+    Fetch stored questions for a topic, optionally filtered by difficulty.
+    Answers are eager-loaded for the response; any other lazy load raises.
+    """
+    params = {"tid": topic_id}
+    if difficulty is None:
+        stmt = _STMT_QUESTIONS_FOR_TOPIC
+    else:
+        stmt = _STMT_QUESTIONS_FOR_TOPIC_AND_DIFFICULTY
+        params["difficulty"] = difficulty
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.scalars(stmt, params).all()
+
+
+@lru_cache(maxsize=1)
+def get_agent() -> Agent:
+    """Build the Anthropic agent once and reuse it (and its HTTP client)"""
+    settings = get_llm_settings()
     model = AnthropicModel(
-        ANTHROPIC_MODEL, provider=AnthropicProvider(api_key=LLM_API_KEY)
+        settings.anthropic_model_test,
+        provider=AnthropicProvider(api_key=settings.anthropic_api_key),
     )
-    agent = Agent(model)
-    response = agent.run_sync(prompt)
+    return Agent(model)
+
+
+async def call_llm_api(prompt: str) -> str:
+    """Call the Anthropic LLM using the pydantic_ai agent."""
+    response = await get_agent().run(prompt)
     print(response.output)
     return response.output
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
-def call_llm_api_with_retry(prompt: str) -> str:
-    """Call LLM API with retry logic built in"""
-    return call_llm_api(prompt)  # Assuming this function exists elsewhere
+def _is_transient_llm_error(exc: BaseException) -> bool:
+    """Rate limits, server errors and dropped connections are worth retrying"""
+    if isinstance(exc, ModelHTTPError):
+        return exc.status_code in (408, 429) or exc.status_code >= 500
+    return isinstance(exc, APIConnectionError)
+
+
+async def call_llm_api_with_retry(prompt: str) -> str:
+    """
+    Call LLM API, retrying transient failures with jittered exponential backoff.
+    Anything else (e.g. a bad request) is raised straight away.
+    """
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=0.5, max=8),
+        retry=retry_if_exception(_is_transient_llm_error),
+        reraise=True,
+    ):
+        with attempt:
+            return await call_llm_api(prompt)
 
 
 def extract_json_from_response(response: str) -> list[dict[str, Any]]:
     """Extract and parse JSON from LLM response with better error handling"""
     try:
         # First try to parse the entire response as JSON
-        return json.loads(response)
-    except json.JSONDecodeError:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
         # Try to repair the JSON
         try:
             repaired = repair_json(response)
-            return json.loads(repaired)
+            return orjson.loads(repaired)
         except Exception:
-            # If that fails, look for JSON array in the response
-            import re
-
-            json_pattern = r"\[\s*\{.*\}\s*\]"
-            match = re.search(json_pattern, response, re.DOTALL)
-            if match:
+            # If that fails, look for JSON array in the response, preferring
+            # one inside a markdown code block
+            match = _MD_JSON_RE.search(response)
+            array_text = match.group(1) if match else None
+            if array_text is None and (match := _JSON_ARRAY_RE.search(response)):
+                array_text = match.group(0)
+            if array_text:
                 try:
-                    return json.loads(match.group(0))
-                except json.JSONDecodeError:
-                    repaired = repair_json(match.group(0))
-                    return json.loads(repaired)
+                    return orjson.loads(array_text)
+                except orjson.JSONDecodeError:
+                    repaired = repair_json(array_text)
+                    return orjson.loads(repaired)
 
             # If still fails, try to find individual JSON objects
             questions = []
-            pattern = r"\{(?:[^{}]|(?:\{[^{}]*\}))*\}"
-            matches = re.finditer(pattern, response)
-            for match in matches:
+            for match in _JSON_OBJECT_RE.finditer(response):
                 try:
-                    question = json.loads(match.group(0))
+                    question = orjson.loads(match.group(0))
                     questions.append(question)
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"Error parsing question JSON: {e}")
                 except Exception as e:
                     print(f"Unexpected error parsing question: {e}")
@@ -76,142 +196,102 @@ def extract_json_from_response(response: str) -> list[dict[str, Any]]:
             raise ValueError("Failed to extract valid JSON from response")
 
 
-def validate_question(question: dict[str, Any], question_type: str) -> bool:
-    """Validate a single question based on criteria"""
-    # Check required fields
-    required_fields = ["text", "question_type", "difficulty", "answers"]
-    if not all(field in question for field in required_fields):
-        return False
+def validate_question(question: Any) -> Optional[GeneratedQuestion]:
+    """Validate a single question, returning None if it doesn't fit the schema"""
+    try:
+        return GeneratedQuestion.model_validate(question)
+    except ValidationError:
+        return None
+
+
+def parse_questions(response: str) -> list[GeneratedQuestion]:
+    """
+    Parse and validate the LLM's questions in a single pass when the response is
+    a clean JSON array; otherwise salvage what JSON there is and keep the valid ones.
+    """
+    try:
+        return _GENERATED_QUESTIONS.validate_json(response)
+    except ValidationError:
+        pass
+
+    questions = extract_json_from_response(response)
 
-    # Validate answers based on question type
-    if question["question_type"] == QuestionType.multiple_choice:
-        answers = question.get("answers", [])
-        # Check if there are at least 4 answers
-        if len(answers) < 4:
-            return False
-        # Check if exactly one answer is marked correct
-        correct_count = sum(1 for a in answers if a.get("is_correct", False))
-        if correct_count != 1:
-            return False
+    # Make sure questions is a list
+    if not isinstance(questions, list):
+        questions = [questions]
 
-    return True
+    return [
+        question
+        for question in map(validate_question, questions)
+        if question is not None
+    ]
 
 
-def generate_questions_from_content(
+def build_question_prompt(
     topic_name: str,
-    topic_description: str,
-    contents: list[dict[str, Any]],
+    contents: list[ContentOut],
     difficulty: Optional[DifficultyLevel] = None,
     question_count: int = 3,
     question_type: str = QuestionType.multiple_choice,
-    retries: int = 3,
-) -> list[dict[str, Any]]:
-    """Generate quiz questions using LLM based on topic content"""
+) -> str:
+    """Render the question generation prompt for a topic's content"""
     # Format the content for the LLM prompt
-    formatted_content = ""
+    parts = []
     for content in contents:
-        content_type = content.get("content_type", "")
-        title = content.get("title", "")
-        text = content.get("text_content", "")
-        latex = content.get("latex_content", "")
-
-        formatted_content += f"--- {content_type.upper()}: {title} ---\n"
-        formatted_content += f"{text}\n"
-        if latex:
-            formatted_content += f"LaTeX: {latex}\n"
-        formatted_content += "\n"
+        parts.append(f"--- {content.content_type.upper()}: {content.title} ---")
+        parts.append(content.text_content)
+        if content.latex_content:
+            parts.append(f"LaTeX: {content.latex_content}")
+        parts.append("")
+    formatted_content = "\n".join(parts)
 
     # Determine difficulty level for prompt
     difficulty_text = ""
     if difficulty:
-        difficulty_text = f"at {difficulty} difficulty level"
+        difficulty_text = f"at {DifficultyLevel(difficulty).value} difficulty level"
 
-    # Prefill the expected JSON structure
-    json_prefill = """[
-  {
-    "text": """
+    # Enum members render as e.g. "QuestionType.multiple_choice", which the
+    # model would copy into its output, so the prompt uses the plain values
+    return _QUESTION_PROMPT.substitute(
+        question_count=question_count,
+        question_type=QuestionType(question_type).value,
+        difficulty_text=difficulty_text,
+        topic_name=topic_name,
+        formatted_content=formatted_content,
+    )
 
-    # Create the prompt for the LLM
-    prompt = f"""
-You are an expert linear algebra instructor.
-Create {question_count} {question_type} questions {difficulty_text}.
-Topic name: {topic_name}
-Here is the content material for this topic:
-{formatted_content}
-For each question:
-1. Create a clear, concise question text.
-2. For multiple choice questions, provide exactly 4 answer options
-3. There should be ONE correct answer and THREE plausible distractors.
-4. Include LaTeX where appropriate for mathematical notation.
-5. Explain why the correct answer is correct and why each incorrect answer is wrong.
-6. Assign the appropriate difficulty level (easy, medium, or hard).
-Format your response as a JSON array of question objects.
-Each object MUST have the following structure:
-{{
-  "text": "Question text",
-  "latex_content": "LaTeX representation (if needed)",
-  "question_type": "{question_type}",
-  "difficulty": "easy|medium|hard",
-  "answers": [
-    {{
-      "text": "Answer option text",
-      "latex_content": "LaTeX representation (if needed)",
-      "is_correct": true|false,
-      "explanation": "Explanation why this answer is correct/incorrect"
-    }},
-    ...more answers...
-  ]
-}}
 
-IMPORTANT: Make sure the JSON is valid and properly formatted.
-Start your response with {json_prefill}
-"""
+async def generate_questions_from_content(
+    topic_name: str,
+    topic_description: str,
+    contents: list[ContentOut],
+    difficulty: Optional[DifficultyLevel] = None,
+    question_count: int = 3,
+    question_type: str = QuestionType.multiple_choice,
+    retries: int = 3,
+) -> list[GeneratedQuestion]:
+    """Generate quiz questions using LLM based on topic content"""
+    prompt = build_question_prompt(
+        topic_name, contents, difficulty, question_count, question_type
+    )
 
-    # Implement retry logic with tenacity
-    try:
-        # Call the LLM API with built-in retries
-        response = call_llm_api_with_retry(prompt)
-
-        # Extract and parse the JSON response
-        questions = extract_json_from_response(response)
-
-        # Make sure questions is a list
-        if not isinstance(questions, list):
-            questions = [questions]
-
-        # Validate each question
-        validated_questions = []
-        for question in questions:
-            if validate_question(question, question_type):
-                validated_questions.append(question)
-
-        if not validated_questions and retries > 0:
-            # If no valid questions, retry with one fewer retry
-            return generate_questions_from_content(
-                topic_name=topic_name,
-                topic_description=topic_description,
-                contents=contents,
-                difficulty=difficulty,
-                question_count=question_count,
-                question_type=question_type,
-                retries=retries - 1,
-            )
-
-        return validated_questions
-
-    except Exception as e:
-        print(f"Error generating questions: {str(e)}")
-        if retries > 0:
-            # Retry with one fewer retry
-            return generate_questions_from_content(
-                topic_name=topic_name,
-                topic_description=topic_description,
-                contents=contents,
-                difficulty=difficulty,
-                question_count=question_count,
-                question_type=question_type,
-                retries=retries - 1,
-            )
-        else:
-            print("Error generating questions: Max retries exceeded")
+    # The prompt is built once; API failures are retried (with backoff) only in
+    # call_llm_api_with_retry, this loop only re-asks when the output is unusable
+    for attempt in range(retries + 1):
+        try:
+            response = await call_llm_api_with_retry(prompt)
+        except Exception as e:
+            print(f"Error generating questions: {str(e)}")
             return []
+
+        try:
+            # Parse and validate the questions in the response
+            validated_questions = parse_questions(response)
+        except ValueError as e:
+            print(f"Error parsing questions: {str(e)}")
+            continue
+        if validated_questions:
+            return validated_questions
+
+    print("Error generating questions: Max retries exceeded")
+    return []
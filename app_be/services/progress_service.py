@@ -1,34 +1,94 @@
 # type: ignore
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import desc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, desc, func, select
+from sqlalchemy.orm import Session, selectinload
 
+from app_be.database import cache
 from app_be.models.db_models import (
     Answer,
+    Chapter,
     KnowledgeGap,
     Question,
     QuizAttempt,
     Topic,
+    UserAnswer,
     UserProgress,
 )
-from app_be.models.schemas import (
-    KnowledgeGapCreate,
-    QuizResult,
-    UserProgressCreate,
-)
+from app_be.models.schemas import KnowledgeGapCreate
+from app_be.models.schemas import QuizAttempt as QuizAttemptSchema
+from app_be.models.schemas import QuizResult, UserProgressCreate
 from app_be.services import content_service
 
+# Latest progress entry per topic for a user, reduced in SQL with a window
+# function so only one row per topic leaves the database
+_RANKED_PROGRESS = (
+    select(
+        UserProgress.topic_id,
+        UserProgress.score,
+        UserProgress.completed_at,
+        func.row_number()
+        .over(
+            partition_by=UserProgress.topic_id,
+            order_by=(desc(UserProgress.completed_at), desc(UserProgress.id)),
+        )
+        .label("rank"),
+    )
+    .where(UserProgress.user_id == bindparam("uid"))
+    .subquery()
+)
+_LATEST_PROGRESS = (
+    select(
+        _RANKED_PROGRESS.c.topic_id,
+        _RANKED_PROGRESS.c.score,
+        _RANKED_PROGRESS.c.completed_at,
+    )
+    .where(_RANKED_PROGRESS.c.rank == 1)
+    .subquery()
+)
+
+# A topic counts as completed once its latest score reaches this threshold
+COMPLETION_THRESHOLD = 0.7
+
+# Every chaptered topic with the user's latest progress on it, plus completed
+# and total topic counts per chapter and overall, aggregated in the same query
+_COMPLETED_COUNT = func.count().filter(_LATEST_PROGRESS.c.score >= COMPLETION_THRESHOLD)
+_STMT_TOPIC_PROGRESS = (
+    select(
+        Topic.id.label("topic_id"),
+        _LATEST_PROGRESS.c.score,
+        _LATEST_PROGRESS.c.completed_at,
+        func.count().over(partition_by=Topic.chapter_id).label("chapter_total"),
+        _COMPLETED_COUNT.over(partition_by=Topic.chapter_id).label("chapter_done"),
+        func.count().over().label("total"),
+        _COMPLETED_COUNT.over().label("done"),
+    )
+    .outerjoin(_LATEST_PROGRESS, _LATEST_PROGRESS.c.topic_id == Topic.id)
+    .where(Topic.chapter_id.is_not(None))
+)
+
+# Dashboards poll the curriculum summary; recompute it at most once a minute
+CURRICULUM_CACHE_TTL = 60  # in seconds
+
+# Correct answers do not change once authored; reseeding clears them along
+# with the rest of the content cache
+CORRECT_ANSWER_CACHE_TTL = 86400  # in seconds
+
 
 def get_user_progress(
     db: Session, user_id: int, topic_id: Optional[int] = None
 ) -> List[UserProgress]:
     """Get all progress records for a user, optionally filtered by topic"""
-    query = db.query(UserProgress).filter(UserProgress.user_id == user_id)
+    # Topic and user are part of the response, so batch-load them up front
+    query = (
+        db.query(UserProgress)
+        .options(selectinload(UserProgress.topic), selectinload(UserProgress.user))
+        .filter_by(user_id=user_id)
+    )
 
     if topic_id is not None:
-        query = query.filter(UserProgress.topic_id == topic_id)
+        query = query.filter_by(topic_id=topic_id)
 
     return query.order_by(desc(UserProgress.completed_at)).all()
 
@@ -40,12 +100,14 @@ def create_progress(db: Session, progress: UserProgressCreate) -> UserProgress:
         topic_id=progress.topic_id,
         score=progress.score,
         time_spent=progress.time_spent,
-        completed_at=datetime.now(),
+        completed_at=datetime.now(timezone.utc),
         difficulty=progress.difficulty,
     )
 
     # Get topic name if not provided
     if progress.topic_name is None:
+        # On the request's own session: a cached lookup would check out a
+        # second pool connection on a miss while this one is held
         topic = content_service.get_topic_by_id(db, progress.topic_id)
         if topic:
             db_progress.topic_name = topic.name
@@ -54,18 +116,24 @@ def create_progress(db: Session, progress: UserProgressCreate) -> UserProgress:
 
     db.add(db_progress)
     db.commit()
-    db.refresh(db_progress)
+
+    # The user's curriculum summary is stale now
+    cache.delete(_curriculum_cache_key(progress.user_id))
     return db_progress
 
 
-def get_knowledge_gaps(db: Session, user_id: int) -> List[KnowledgeGap]:
-    """Get identified knowledge gaps for a user"""
-    return (
+def get_knowledge_gaps(
+    db: Session, user_id: int, limit: Optional[int] = None
+) -> List[KnowledgeGap]:
+    """Get identified knowledge gaps for a user, optionally only the first few"""
+    query = (
         db.query(KnowledgeGap)
         .filter(KnowledgeGap.user_id == user_id)
         .order_by(KnowledgeGap.confidence_level)  # Sort by lowest confidence first
-        .all()
     )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
 def create_knowledge_gap(db: Session, gap: KnowledgeGapCreate) -> KnowledgeGap:
@@ -75,12 +143,11 @@ def create_knowledge_gap(db: Session, gap: KnowledgeGapCreate) -> KnowledgeGap:
         topic_id=gap.topic_id,
         confidence_level=gap.confidence_level,
         meta_data=gap.meta_data,
-        identified_at=datetime.now(),
+        identified_at=datetime.now(timezone.utc),
     )
 
     db.add(db_gap)
     db.commit()
-    db.refresh(db_gap)
     return db_gap
 
 
@@ -88,15 +155,22 @@ def get_quiz_attempts(
     db: Session, user_id: int, topic_id: Optional[int] = None
 ) -> List[QuizAttempt]:
     """Get quiz attempts for a user, optionally filtered by topic"""
-    query = db.query(QuizAttempt).filter(QuizAttempt.user_id == user_id)
+    query = (
+        db.query(QuizAttempt)
+        .options(selectinload(QuizAttempt.answers))
+        .filter(QuizAttempt.user_id == user_id)
+    )
 
     if topic_id is not None:
-        # Join with Answer and Question to filter by topic_id
-        query = (
-            query.join(Answer, QuizAttempt.id == Answer.quiz_attempt_id)
-            .join(Question, Answer.question_id == Question.id)
-            .filter(Question.topic_id == topic_id)
-            .distinct()
+        # Semi-join on the attempt's answers rather than JOIN ... DISTINCT
+        query = query.filter(
+            select(UserAnswer.id)
+            .join(Question, UserAnswer.question_id == Question.id)
+            .where(
+                UserAnswer.quiz_attempt_id == QuizAttempt.id,
+                Question.topic_id == topic_id,
+            )
+            .exists()
         )
 
     return query.order_by(desc(QuizAttempt.started_at)).all()
@@ -104,11 +178,17 @@ def get_quiz_attempts(
 
 def get_quiz_result(db: Session, attempt_id: int) -> Optional[QuizResult]:
     """Get detailed results for a specific quiz attempt"""
-    # Get the quiz attempt with answers
+    # Get the quiz attempt with answers, their questions and topics
     quiz_attempt = (
         db.query(QuizAttempt)
-        .options(joinedload(QuizAttempt.answers).joinedload(Answer.question))
-        .options(joinedload(QuizAttempt.answers).joinedload(Answer.selected_answer))
+        .options(
+            # Answers come in a second IN query so the attempt row is not
+            # repeated per answer; their question, topic and choice join there
+            selectinload(QuizAttempt.answers)
+            .joinedload(UserAnswer.question)
+            .joinedload(Question.topic),
+            selectinload(QuizAttempt.answers).joinedload(UserAnswer.selected_answer),
+        )
         .filter(QuizAttempt.id == attempt_id)
         .first()
     )
@@ -117,37 +197,40 @@ def get_quiz_result(db: Session, attempt_id: int) -> Optional[QuizResult]:
         return None
 
     # Convert to schema
-    quiz_attempt_schema = QuizAttempt.from_orm(quiz_attempt)
-
-    # Identify knowledge gaps from this quiz
-    topic_ids = set()
-    knowledge_gaps = []
-
-    for answer in quiz_attempt.answers:
-        if not answer.is_correct:
-            topic_id = answer.question.topic_id
-            topic_ids.add(topic_id)
+    quiz_attempt_schema = QuizAttemptSchema.model_validate(quiz_attempt)
 
-            # Get topic info
-            topic = content_service.get_topic_by_id(db, topic_id)
-
-            knowledge_gaps.append(
-                {
-                    "topic_id": topic_id,
-                    "topic_name": topic.name if topic else "Unknown",
-                    "question_id": answer.question_id,
-                    "question_text": answer.question.text,
-                    "correct_answer": get_correct_answer_text(db, answer.question_id),
-                }
-            )
+    # Identify knowledge gaps from this quiz, then fetch everything they need
+    # in one query each rather than per answer/topic
+    wrong_answers = [answer for answer in quiz_attempt.answers if not answer.is_correct]
+    correct_texts = get_correct_answer_texts(
+        db, [answer.question_id for answer in wrong_answers]
+    )
+    topics = {
+        answer.question.topic_id: answer.question.topic for answer in wrong_answers
+    }
+    contents_by_topic = content_service.get_content_for_topics(db, list(topics))
+
+    knowledge_gaps = [
+        {
+            "topic_id": answer.question.topic_id,
+            "topic_name": (
+                answer.question.topic.name if answer.question.topic else "Unknown"
+            ),
+            "question_id": answer.question_id,
+            "question_text": answer.question.text,
+            "correct_answer": correct_texts.get(
+                answer.question_id, "No correct answer found"
+            ),
+        }
+        for answer in wrong_answers
+    ]
 
     # Generate recommendations based on knowledge gaps
     recommendations = []
-    for topic_id in topic_ids:
-        topic = content_service.get_topic_by_id(db, topic_id)
+    for topic_id, topic in topics.items():
         if topic:
             # Find related content for review
-            contents = content_service.get_content_for_topic(db, topic_id)
+            contents = contents_by_topic.get(topic_id, [])
 
             recommendation = {
                 "topic_id": topic_id,
@@ -165,32 +248,41 @@ def get_quiz_result(db: Session, attempt_id: int) -> Optional[QuizResult]:
     )
 
 
-def get_curriculum_summary(db: Session, user_id: int) -> Dict[str, Any]:
-    """Get overall curriculum progress statistics for a user"""
+def _curriculum_cache_key(user_id: int) -> str:
+    """Cache key of a user's curriculum summary"""
+    return f"curr:{user_id}"
+
+
+def get_curriculum_summary(
+    db: Session, user_id: int, chapters: Optional[List[Chapter]] = None
+) -> Dict[str, Any]:
+    """
+    Get overall curriculum progress statistics for a user (cached briefly).
+    Reuses chapters (loaded with their topics) when the caller has them.
+    """
+    return cache.get_or_set(
+        _curriculum_cache_key(user_id),
+        CURRICULUM_CACHE_TTL,
+        lambda: _compute_curriculum_summary(db, user_id, chapters),
+    )
+
+
+def _compute_curriculum_summary(
+    db: Session, user_id: int, chapters: Optional[List[Chapter]] = None
+) -> Dict[str, Any]:
+    """Compute overall curriculum progress statistics for a user"""
     # Get all chapters and topics
-    chapters = content_service.get_all_chapters(db, with_topics=True)
-
-    # Get user progress by topic
-    progress_entries = get_user_progress(db, user_id)
-
-    # Map topics to progress
-    topic_progress = {}
-    for entry in progress_entries:
-        if (
-            entry.topic_id not in topic_progress
-            or entry.completed_at > topic_progress[entry.topic_id]["completed_at"]
-        ):
-            topic_progress[entry.topic_id] = {
-                "score": entry.score,
-                "completed_at": entry.completed_at,
-            }
+    if chapters is None:
+        chapters = content_service.get_all_chapters(db)
+
+    # The user's latest progress per topic, with completion counts from SQL
+    topic_rows = {
+        row.topic_id: row for row in db.execute(_STMT_TOPIC_PROGRESS, {"uid": user_id})
+    }
 
     # Organize by chapter
     results = {"overall_progress": 0.0, "chapters": []}
 
-    total_topics = 0
-    completed_topics = 0
-
     for chapter in chapters:
         chapter_info = {
             "chapter_id": chapter.id,
@@ -199,52 +291,54 @@ def get_curriculum_summary(db: Session, user_id: int) -> Dict[str, Any]:
             "topics": [],
         }
 
-        chapter_topics = 0
-        chapter_completed = 0
-
         for topic in chapter.topics:
-            progress_info = topic_progress.get(topic.topic_id, None)
-            is_completed = progress_info is not None and progress_info["score"] >= 0.7
-
-            topic_info = {
-                "topic_id": topic.topic_id,
-                "topic_name": topic.name,
-                "completed": is_completed,
-                "score": progress_info["score"] if progress_info else 0.0,
-                "completed_at": (
-                    progress_info["completed_at"] if progress_info else None
-                ),
-            }
-
-            chapter_info["topics"].append(topic_info)
-            chapter_topics += 1
-            if is_completed:
-                chapter_completed += 1
-
-            total_topics += 1
-            if is_completed:
-                completed_topics += 1
-
-        # Calculate chapter progress
-        if chapter_topics > 0:
-            chapter_info["progress"] = chapter_completed / chapter_topics
+            row = topic_rows.get(topic.id)
+            score = row.score if row is not None else None
+            if row is not None:
+                chapter_info["progress"] = row.chapter_done / row.chapter_total
+            chapter_info["topics"].append(
+                {
+                    "topic_id": topic.id,
+                    "topic_name": topic.name,
+                    "completed": score is not None and score >= COMPLETION_THRESHOLD,
+                    "score": score if score is not None else 0.0,
+                    "completed_at": row.completed_at if row is not None else None,
+                }
+            )
 
         results["chapters"].append(chapter_info)
 
-    # Calculate overall progress
-    if total_topics > 0:
-        results["overall_progress"] = completed_topics / total_topics
+    # Overall counts are repeated on every row
+    if topic_rows:
+        row = next(iter(topic_rows.values()))
+        results["overall_progress"] = row.done / row.total
 
     return results
 
 
 def generate_recommendations(db: Session, user_id: int) -> Dict[str, Any]:
     """Generate personalized learning recommendations for a user"""
-    # Get knowledge gaps
-    gaps = get_knowledge_gaps(db, user_id)
+    # Get the top 5 knowledge gaps
+    gaps = get_knowledge_gaps(db, user_id, limit=5)
+
+    # One load of the chapters and their topics serves everything below
+    chapters_all = content_service.get_all_chapters(db)
 
     # Get progress summary
-    progress_summary = get_curriculum_summary(db, user_id)
+    progress_summary = get_curriculum_summary(db, user_id, chapters=chapters_all)
+
+    # Topic order and names
+    order_map = {t.id: t.chapter_order for c in chapters_all for t in c.topics}
+    name_map = {t.id: t.name for c in chapters_all for t in c.topics}
+
+    # Gaps may point at topics outside any chapter; name those in one query
+    missing_topic_ids = {gap.topic_id for gap in gaps} - name_map.keys()
+    if missing_topic_ids:
+        name_map.update(
+            db.execute(
+                select(Topic.id, Topic.name).where(Topic.id.in_(missing_topic_ids))
+            ).all()
+        )
 
     # Find topics that need attention (low scores or not completed)
     topics_to_review = []
@@ -254,18 +348,7 @@ def generate_recommendations(db: Session, user_id: int) -> Dict[str, Any]:
         chapter_topics = chapter["topics"]
 
         # Sort topics by chapter_order
-        chapter_topics.sort(
-            key=lambda t: next(
-                (
-                    topic.chapter_order
-                    for topic in content_service.get_chapter_by_id(
-                        db, chapter["chapter_id"]
-                    ).topics
-                    if topic.topic_id == t["topic_id"]
-                ),
-                0,
-            )
-        )
+        chapter_topics.sort(key=lambda t: order_map.get(t["topic_id"], 0))
 
         found_incomplete = False
         for topic in chapter_topics:
@@ -298,28 +381,39 @@ def generate_recommendations(db: Session, user_id: int) -> Dict[str, Any]:
         "knowledge_gaps": [
             {
                 "topic_id": gap.topic_id,
-                "topic_name": db.query(Topic)
-                .filter(Topic.topic_id == gap.topic_id)
-                .first()
-                .name,
+                "topic_name": name_map.get(gap.topic_id, "Unknown"),
                 "confidence_level": gap.confidence_level,
             }
-            for gap in gaps[:5]  # Top 5 knowledge gaps
+            for gap in gaps
         ],
-        "learning_path": generate_learning_path(db, user_id, progress_summary),
+        "learning_path": generate_learning_path(
+            db, user_id, progress_summary, chapters=chapters_all
+        ),
     }
 
     return recommendations
 
 
 def generate_learning_path(
-    db: Session, user_id: int, progress_summary: Dict[str, Any]
+    db: Session,
+    user_id: int,
+    progress_summary: Dict[str, Any],
+    chapters: Optional[List[Chapter]] = None,
 ) -> List[Dict[str, Any]]:
-    """Generate a personalized learning path based on user progress"""
+    """
+    Generate a personalized learning path based on user progress.
+    Reuses chapters (loaded with their topics) when the caller has them.
+    """
     learning_path = []
 
     # Get all chapters with topics sorted by order
-    chapters = content_service.get_all_chapters(db, with_topics=True)
+    if chapters is None:
+        chapters = content_service.get_all_chapters(db)
+
+    # Index the summary's topics once instead of scanning it per topic
+    progress_by_topic = {
+        t["topic_id"]: t for c in progress_summary["chapters"] for t in c["topics"]
+    }
 
     for chapter in chapters:
         # Sort topics by order
@@ -327,14 +421,8 @@ def generate_learning_path(
 
         for topic in topics:
             # Find if the topic is completed based on progress_summary
-            topic_progress = next(
-                (
-                    t
-                    for c in progress_summary["chapters"]
-                    for t in c["topics"]
-                    if t["topic_id"] == topic.topic_id
-                ),
-                {"completed": False, "score": 0.0},
+            topic_progress = progress_by_topic.get(
+                topic.id, {"completed": False, "score": 0.0}
             )
 
             topic_status = "completed" if topic_progress["completed"] else "not_started"
@@ -345,7 +433,7 @@ def generate_learning_path(
                 {
                     "chapter_id": chapter.id,
                     "chapter_title": chapter.title,
-                    "topic_id": topic.topic_id,
+                    "topic_id": topic.id,
                     "topic_name": topic.name,
                     "status": topic_status,
                     "score": topic_progress["score"],
@@ -355,12 +443,40 @@ def generate_learning_path(
     return learning_path
 
 
-def get_correct_answer_text(db: Session, question_id: int) -> str:
-    """Get the text of the correct answer for a question"""
-    correct_answer = (
-        db.query(Answer)
-        .filter(Answer.question_id == question_id, Answer.is_correct is True)
-        .first()
-    )
+def _correct_answer_key(question_id: int) -> str:
+    """Cache key of a question's correct answer text"""
+    return f"{cache.CONTENT_KEY_PREFIX}answer:{question_id}"
+
+
+def get_correct_answer_texts(db: Session, question_ids: List[int]) -> Dict[int, str]:
+    """
+    Map each question to the text of its correct answer. Cached answers are
+    read from Redis in one round trip; the rest come from a single query.
+    """
+    question_ids = list(dict.fromkeys(question_ids))
+    if not question_ids:
+        return {}
+
+    cached = cache.get_many_json([_correct_answer_key(qid) for qid in question_ids])
+    texts = {qid: text for qid, text in zip(question_ids, cached) if text is not None}
+
+    missing = [qid for qid in question_ids if qid not in texts]
+    if missing:
+        loaded = dict(
+            db.execute(
+                select(Answer.question_id, Answer.text).where(
+                    Answer.question_id.in_(missing), Answer.is_correct.is_(True)
+                )
+            ).all()
+        )
+        cache.set_many_json(
+            {
+                _correct_answer_key(qid): text
+                for qid, text in loaded.items()
+                if text is not None
+            },
+            CORRECT_ANSWER_CACHE_TTL,
+        )
+        texts.update(loaded)
 
-    return correct_answer.text if correct_answer else "No correct answer found"
+    return texts
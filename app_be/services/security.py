@@ -1,38 +1,70 @@
 # type: ignore
+import hashlib
 import os
-from datetime import datetime, timedelta
-from typing import Optional, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Union
 
+import bcrypt
 import jwt
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from jwt.exceptions import InvalidTokenError
-from passlib.context import CryptContext
 
 load_dotenv()
 
-# Password hashing settings
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing settings; each extra bcrypt round doubles the hashing time
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt only reads the first 72 bytes of a password; longer ones are
+# truncated explicitly, as passlib did, since newer bcrypt releases reject them
+BCRYPT_MAX_PASSWORD_BYTES = 72
 
-# JWT settings
+# JWT settings: tokens are signed with an Ed25519 private key (PEM) and
+# verified with its public key, which can be shared with other services
 SECRET_KEY = os.getenv("DB_SECRET_KEY")
-ALGORITHM = "HS256"
+PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+ALGORITHM = "EdDSA"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Recently verified token payloads, keyed by a digest of the token
+VERIFIED_TOKEN_CACHE_SIZE = 10_000
+VERIFIED_TOKEN_CACHE_TTL = 60  # in seconds
+_verified_tokens = TTLCache(
+    maxsize=VERIFIED_TOKEN_CACHE_SIZE, ttl=VERIFIED_TOKEN_CACHE_TTL
+)
+_verified_tokens_lock = threading.Lock()
+
+
+def _password_bytes(password: str) -> bytes:
+    """Encode a password the way bcrypt consumes it"""
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
 
 def get_password_hash(password: str) -> str:
     """Hash a password for storing"""
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("ascii")
+
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Hash many passwords in parallel; bcrypt releases the GIL while hashing"""
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(get_password_hash, passwords))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(
+        _password_bytes(plain_password), hashed_password.encode("ascii")
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
-    expire = datetime.now(datetime.UTC) + (
+    expire = datetime.now(timezone.utc) + (
         expires_delta
         if expires_delta
         else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -42,10 +74,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def _token_key(token: str) -> bytes:
+    """Short digest of a token, so the cache doesn't hold the tokens themselves"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
 def verify_token(token: str) -> Union[dict, None]:
-    """Verify a JWT token and return its payload"""
+    """
+    Verify a JWT token and return its payload. Verified payloads are cached
+    briefly so repeat requests with the same token skip the signature check.
+    """
+    key = _token_key(token)
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(key)
+    if payload is not None:
+        # The cache entry can outlive the token itself
+        if payload["exp"] > time.time():
+            return dict(payload)
+        with _verified_tokens_lock:
+            _verified_tokens.pop(key, None)
+        return None
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = jwt.decode(token, PUBLIC_KEY, algorithms=[ALGORITHM])
     except InvalidTokenError:
         return None
+
+    if "exp" in payload:
+        with _verified_tokens_lock:
+            _verified_tokens[key] = dict(payload)
+    return payload
@@ -1,67 +1,117 @@
 # type: ignore
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session, load_only
 
 from app_be.models.db_models import User
 from app_be.models.schemas import UserCreate, UserUpdate
-from app_be.services.security import get_password_hash
 
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
-    """Get a user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    """Get a user by ID, from the session's identity map when already loaded"""
+    return db.get(User, user_id)
+
+
+def user_exists(db: Session, user_id: int) -> bool:
+    """Check whether a user exists without loading the row"""
+    return db.execute(select(exists().where(User.id == user_id))).scalar()
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    """Get a user by email"""
-    return db.query(User).filter(User.email == email).first()
+    """Get a user by email, loading only the columns needed to authenticate"""
+    return db.scalar(
+        select(User)
+        .options(load_only(User.id, User.email, User.hashed_password, User.is_active))
+        .where(func.lower(User.email) == email.strip().lower())
+    )
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get a list of users with pagination"""
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, after_id: int = 0, limit: int = 100) -> List[User]:
+    """Get the users after a given ID, in ID order (keyset pagination)"""
+    return db.scalars(
+        select(User).where(User.id > after_id).order_by(User.id).limit(limit)
+    ).all()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
-    """Create a new user"""
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """Create a new user; the caller hashes the password before any query runs"""
     db_user = User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password,
         is_active=True,
-        created_at=datetime.now(),
+        created_at=datetime.now(timezone.utc),
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
-def update_user(db: Session, user_id: int, user: UserUpdate) -> User:
-    """Update a user's information"""
-    db_user = get_user(db, user_id)
-
-    update_data = user.dict(exclude_unset=True)
-
-    # Hash the password if it's being updated
-    if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
-
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-
+def create_users_bulk(
+    db: Session, users: List[UserCreate], hashed_passwords: List[str]
+) -> List[User]:
+    """
+    Create many users with one INSERT ... RETURNING and a single commit.
+    The caller hashes the passwords (see security.get_password_hashes).
+    """
+    if not users:
+        return []
+
+    created_at = datetime.now(timezone.utc)
+    db_users = db.scalars(
+        insert(User).returning(User),
+        [
+            {
+                "email": user.email,
+                "username": user.username,
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "created_at": created_at,
+            }
+            for user, hashed_password in zip(users, hashed_passwords, strict=True)
+        ],
+    ).all()
+    db.commit()
+    return db_users
+
+
+def update_user(
+    db: Session,
+    user_id: int,
+    user: UserUpdate,
+    hashed_password: Optional[str] = None,
+) -> Optional[User]:
+    """
+    Update a user's information with a single UPDATE ... RETURNING statement.
+    A new password must be hashed by the caller and passed as hashed_password.
+    Returns None if the user does not exist.
+    """
+    update_data = user.model_dump(exclude_unset=True, exclude={"password"})
+    if hashed_password is not None:
+        update_data["hashed_password"] = hashed_password
+
+    if not update_data:
+        return get_user(db, user_id)
+
+    db_user = db.execute(
+        update(User).where(User.id == user_id).values(**update_data).returning(User)
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
-def deactivate_user(db: Session, user_id: int) -> User:
-    """Deactivate a user (soft delete)"""
-    db_user = get_user(db, user_id)
-    db_user.is_active = False
+def deactivate_user(db: Session, user_id: int) -> Optional[int]:
+    """
+    Deactivate a user (soft delete) with a single UPDATE statement.
+    Returns the user's ID, or None if the user does not exist.
+    """
+    deactivated_id = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_active=False)
+        .returning(User.id)
+    ).scalar_one_or_none()
     db.commit()
-    db.refresh(db_user)
-    return db_user
+    return deactivated_id
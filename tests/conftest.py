@@ -0,0 +1,72 @@
+# type: ignore
+
+import os
+import tempfile
+
+import pytest
+
+# The engine is built when app_be.database.db is first imported, so point it at
+# a throwaway SQLite file (and away from Redis) before any app module loads
+_DB_DIR = tempfile.mkdtemp(prefix="teaching-agent-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.pop("REDIS_URL", None)
+
+from sqlalchemy import event  # noqa: E402
+
+from app_be.database.db import Base, SessionLocal, engine, init_db  # noqa: E402
+from app_be.models.db_models import Chapter, Content, Topic  # noqa: E402
+from app_be.services import content_service  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables holding a small two-chapter textbook"""
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    content_service.bump_content_version()
+    content_service._has_content_fts.cache_clear()
+
+    session = SessionLocal()
+    session.add_all(
+        [
+            Chapter(id=1, title="Vectors"),
+            Chapter(id=2, title="Matrices"),
+            Topic(id=1, name="Vector Addition", chapter_id=1, chapter_order=1),
+            Topic(id=2, name="Dot Product", chapter_id=1, chapter_order=2),
+            Topic(id=3, name="Matrix Multiplication", chapter_id=2, chapter_order=1),
+            Content(
+                id=1,
+                title="Adding vectors",
+                content_type="lesson",
+                text_content="Vectors are added component by component.",
+                topic_id=1,
+            ),
+            Content(
+                id=2,
+                title="Multiplying matrices",
+                content_type="example",
+                text_content="Each entry is a row-column dot product.",
+                topic_id=3,
+            ),
+        ]
+    )
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def query_counter():
+    """Count the SQL statements executed while the test runs"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
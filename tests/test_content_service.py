@@ -0,0 +1,45 @@
+# type: ignore
+
+from sqlalchemy import text
+
+from app_be.models.db_models import Content
+from app_be.services import content_service
+
+
+def test_search_matches_word_prefixes_through_fts(db):
+    results = content_service.search_topics_and_content(db, "vector")
+
+    assert [topic.id for topic in results["topics"]] == [1]
+    # "vector" is a prefix of "Vectors"/"vectors" in the content
+    assert [content.id for content in results["contents"]] == [1]
+
+
+def test_search_index_follows_content_changes(db):
+    db.add(
+        Content(
+            id=3,
+            title="Eigenvalues",
+            content_type="definition",
+            text_content="A scalar that stretches an eigenvector.",
+            topic_id=3,
+        )
+    )
+    db.get(Content, 1).text_content = "Component-wise sums."
+    db.commit()
+
+    results = content_service.search_topics_and_content(db, "eigen")
+    assert [content.id for content in results["contents"]] == [3]
+
+    results = content_service.search_topics_and_content(db, "component")
+    assert [content.id for content in results["contents"]] == [1]
+
+
+def test_search_falls_back_to_ilike_without_fts_table(db):
+    db.execute(text("DROP TABLE content_fts"))
+    db.commit()
+    content_service._has_content_fts.cache_clear()
+
+    results = content_service.search_topics_and_content(db, "dot product")
+
+    assert [topic.id for topic in results["topics"]] == [2]
+    assert [content.id for content in results["contents"]] == [2]
@@ -0,0 +1,58 @@
+# type: ignore
+
+import re
+
+from app_be.models.enums import ContentType, DifficultyLevel, QuestionType
+from app_be.models.schemas import ContentOut
+from app_be.services import llm_service
+
+CONTENTS = [
+    ContentOut(
+        id=1,
+        title="Adding vectors",
+        content_type=ContentType.lesson,
+        text_content="Vectors are added component by component.",
+        topic_id=1,
+    )
+]
+
+
+def _answer(text, is_correct):
+    return {"text": text, "is_correct": is_correct}
+
+
+def test_question_prompt_uses_plain_enum_values():
+    prompt = llm_service.build_question_prompt(
+        "Vector Addition",
+        CONTENTS,
+        difficulty=DifficultyLevel.hard,
+        question_type=QuestionType.multiple_choice,
+    )
+
+    assert "Create 3 multiple_choice questions at hard difficulty level." in prompt
+    assert '"question_type": "multiple_choice"' in prompt
+    assert "--- LESSON: Adding vectors ---" in prompt
+    assert "QuestionType." not in prompt
+    assert "DifficultyLevel." not in prompt
+
+
+def test_question_type_from_prompt_example_validates():
+    prompt = llm_service.build_question_prompt("Vector Addition", CONTENTS)
+    question_type = re.search(r'"question_type": "(\w+)"', prompt).group(1)
+
+    question = llm_service.validate_question(
+        {
+            "text": "What is (1, 2) + (3, 4)?",
+            "question_type": question_type,
+            "difficulty": "easy",
+            "answers": [
+                _answer("(4, 6)", True),
+                _answer("(3, 8)", False),
+                _answer("(2, 2)", False),
+                _answer("(4, 5)", False),
+            ],
+        }
+    )
+
+    assert question is not None
+    assert question.question_type == QuestionType.multiple_choice
@@ -0,0 +1,87 @@
+# type: ignore
+
+from datetime import datetime, timezone
+
+from app_be.models.db_models import (
+    Answer,
+    Question,
+    QuizAttempt,
+    UserAnswer,
+    UserProgress,
+)
+from app_be.services import progress_service
+
+
+def _progress(topic_id, score, completed_at, **kwargs):
+    return UserProgress(
+        user_id=1,
+        topic_id=topic_id,
+        score=score,
+        completed_at=datetime(*completed_at, tzinfo=timezone.utc),
+        **kwargs,
+    )
+
+
+def test_curriculum_summary_issues_at_most_three_queries(db, query_counter):
+    db.add(_progress(1, 0.9, (2024, 1, 1)))
+    db.commit()
+    query_counter.clear()
+
+    progress_service.get_curriculum_summary(db, user_id=1)
+
+    assert len(query_counter) <= 3
+
+
+def test_curriculum_summary_uses_latest_progress_per_topic(db):
+    db.add_all(
+        [
+            # Superseded by a later, failing attempt
+            _progress(1, 0.9, (2024, 1, 1)),
+            _progress(1, 0.5, (2024, 1, 2)),
+            # Same timestamp: the newest row wins
+            _progress(2, 0.2, (2024, 1, 3)),
+            _progress(2, 0.8, (2024, 1, 3)),
+            _progress(3, 0.7, (2024, 1, 4)),
+        ]
+    )
+    db.commit()
+
+    summary = progress_service.get_curriculum_summary(db, user_id=1)
+
+    vectors, matrices = summary["chapters"]
+    assert [(t["topic_id"], t["score"], t["completed"]) for t in vectors["topics"]] == [
+        (1, 0.5, False),
+        (2, 0.8, True),
+    ]
+    assert vectors["progress"] == 0.5
+    assert matrices["progress"] == 1.0
+    assert summary["overall_progress"] == 2 / 3
+
+
+def test_curriculum_summary_without_progress(db):
+    summary = progress_service.get_curriculum_summary(db, user_id=1)
+
+    assert summary["overall_progress"] == 0.0
+    assert all(t["score"] == 0.0 for c in summary["chapters"] for t in c["topics"])
+
+
+def test_quiz_attempts_filtered_by_topic(db):
+    db.add_all(
+        [
+            Question(id=1, text="u + v?", question_type="open_ended", topic_id=1),
+            Question(id=2, text="AB?", question_type="open_ended", topic_id=3),
+            Answer(id=1, text="sum", is_correct=True, question_id=1),
+            QuizAttempt(id=1, user_id=1),
+            QuizAttempt(id=2, user_id=1),
+            # Two answers on topic 1 must not duplicate the attempt
+            UserAnswer(quiz_attempt_id=1, question_id=1, is_correct=True),
+            UserAnswer(quiz_attempt_id=1, question_id=1, is_correct=False),
+            UserAnswer(quiz_attempt_id=2, question_id=2, is_correct=True),
+        ]
+    )
+    db.commit()
+
+    attempts = progress_service.get_quiz_attempts(db, user_id=1, topic_id=1)
+
+    assert [attempt.id for attempt in attempts] == [1]
+    assert len(attempts[0].answers) == 2